@@ -1,28 +1,236 @@
 import asyncio
+import hashlib
+import heapq
 import io
+import itertools
 import logging
 import mimetypes
-from concurrent.futures import ThreadPoolExecutor
-from typing import Dict, Any, Optional
+import multiprocessing
+import os
+import platform
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from queue import Empty, Full, LifoQueue
+from types import MappingProxyType
+from typing import BinaryIO, Dict, Any, FrozenSet, List, Mapping, Optional, Tuple
 from fastapi import FastAPI, File, UploadFile, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from markitdown import MarkItDown
+from fastapi.middleware.gzip import GZipMiddleware
+from markitdown import MarkItDown, StreamInfo
+from markitdown.converters import HtmlConverter
+from prometheus_client import CONTENT_TYPE_LATEST, Gauge, Histogram, generate_latest
 import uvicorn
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _kernel_version() -> Tuple[int, ...]:
+    return tuple(int(part) for part in re.findall(r"\d+", platform.release())[:2])
+
+# Optional io_uring fast path for copying large uploads (Linux 5.1+ with pyuring installed)
+pyuring = None
+if sys.platform == "linux" and _kernel_version() >= (5, 1):
+    try:
+        import pyuring
+    except ImportError:
+        pyuring = None
+
+def parse_size(value: str) -> int:
+    """
+    Parse a byte size such as "50MB" or "1048576"
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*([KMG]?)B?\s*", value, re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid size: {value!r}")
+    number, unit = match.groups()
+    return int(number) * 1024 ** "_KMG".index(unit.upper() or "_")
+
+# Largest accepted upload per file (0 disables the limit)
+MAX_FILE_SIZE = parse_size(os.getenv("MAX_FILE_SIZE", "0"))
+# Allowance for multipart boundaries and part headers around a single uploaded file
+MULTIPART_OVERHEAD = 64 * 1024
+
+# Thread pool for CPU-bound operations, installed as the loop's default executor
+THREAD_POOL_SIZE = int(os.getenv("THREAD_POOL_SIZE", min(32, (os.cpu_count() or 4) * 2)))
+executor: Optional[ThreadPoolExecutor] = None
+
+class SizeAwareSemaphore:
+    """
+    Semaphore that admits waiting conversions largest upload first, so big
+    files start early and small ones backfill the remaining slots
+    """
+
+    def __init__(self, value: int):
+        self._value = value
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+
+    async def acquire(self, size: int = 0) -> None:
+        if self._value > 0 and not self._waiters:
+            self._value -= 1
+            return
+        # Ties between equal sizes are admitted in arrival order
+        entry = (-size, next(self._counter), asyncio.get_running_loop().create_future())
+        heapq.heappush(self._waiters, entry)
+        try:
+            await entry[2]
+        except asyncio.CancelledError:
+            if entry[2].cancelled():
+                # release() may already have popped and skipped this entry
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+            else:
+                # The slot was handed over just before cancellation; pass it on
+                self.release()
+            raise
+
+    def release(self) -> None:
+        # Skip waiters cancelled since they queued; their own cleanup has not run yet
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._value += 1
+
+# Bound on in-flight conversions so excess requests wait here instead of in the pool queue
+MAX_CONCURRENT_CONVERT = int(os.getenv("MAX_CONCURRENT_CONVERT", THREAD_POOL_SIZE * 2))
+# Seconds to wait for a conversion slot before answering 503 (0 waits indefinitely)
+CONVERT_QUEUE_TIMEOUT = float(os.getenv("CONVERT_QUEUE_TIMEOUT", "0"))
+convert_semaphore: Optional[SizeAwareSemaphore] = None
+
+# Process pool for the GIL-bound PDF/DOCX/XLSX/PPTX backends (0 keeps them on the thread pool)
+PROCESS_POOL_SIZE = int(os.getenv("PROCESS_POOL_SIZE", os.cpu_count() or 1))
+cpu_pool: Optional[ProcessPoolExecutor] = None
+
+# Files from a single /parse_batch request converted at once
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", THREAD_POOL_SIZE))
+
+# Run a throwaway conversion in every pool at startup so first requests see steady-state latency
+WARM_UP = os.getenv("WARM_UP", "true").lower() in ("1", "true", "yes")
+
+def create_cpu_pool() -> ProcessPoolExecutor:
+    """
+    Start the process pool used for PDF/DOCX/XLSX/PPTX conversions
+    """
+    # Spawned workers import this module afresh, giving each its own MarkItDown
+    # instance, and avoid forking a process that already runs threads
+    return ProcessPoolExecutor(
+        max_workers=PROCESS_POOL_SIZE,
+        mp_context=multiprocessing.get_context("spawn")
+    )
+
+def replace_broken_cpu_pool(broken_pool: ProcessPoolExecutor) -> None:
+    """
+    Swap in a fresh process pool after a worker died, unless another request already did
+    """
+    global cpu_pool
+    if cpu_pool is broken_pool:
+        logger.error("A conversion worker died; restarting the process pool")
+        broken_pool.shutdown(wait=False, cancel_futures=True)
+        cpu_pool = create_cpu_pool()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Set up shared resources on startup and release them on shutdown
+    """
+    global executor, convert_semaphore, cpu_pool
+    executor = ThreadPoolExecutor(max_workers=THREAD_POOL_SIZE, thread_name_prefix="mid")
+    asyncio.get_running_loop().set_default_executor(executor)
+    # Created here so the semaphore is bound to the serving event loop
+    convert_semaphore = SizeAwareSemaphore(MAX_CONCURRENT_CONVERT)
+    logger.info(f"Thread pool started with {THREAD_POOL_SIZE} workers")
+    if PROCESS_POOL_SIZE > 0:
+        cpu_pool = create_cpu_pool()
+        logger.info(f"Process pool started with {PROCESS_POOL_SIZE} workers")
+    try:
+        if WARM_UP:
+            await warm_up()
+        yield
+    finally:
+        if cpu_pool is not None:
+            cpu_pool.shutdown(wait=False, cancel_futures=True)
+        executor.shutdown(wait=True)
+
+# Prometheus metrics for sizing the pools: where conversions spend their time and how much work is queued
+CONVERT_SECONDS = Histogram(
+    "markitdown_convert_seconds",
+    "Time from dispatching a conversion to its result, by format",
+    ["format"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+)
+CONVERT_WAIT_SECONDS = Histogram(
+    "markitdown_convert_wait_seconds",
+    "Time spent waiting for a conversion slot"
+)
+CONVERT_WAITING = Gauge(
+    "markitdown_convert_waiting",
+    "Conversions waiting for a slot"
+)
+CONVERT_WAITING.set_function(lambda: len(convert_semaphore._waiters) if convert_semaphore else 0)
+EXECUTOR_QUEUED = Gauge(
+    "markitdown_executor_queued",
+    "Tasks submitted to an executor that no worker has picked up yet",
+    ["pool"]
+)
+EXECUTOR_QUEUED.labels("thread").set_function(lambda: executor._work_queue.qsize() if executor else 0)
+EXECUTOR_QUEUED.labels("process").set_function(
+    lambda: max(0, len(cpu_pool._pending_work_items) - PROCESS_POOL_SIZE) if cpu_pool else 0
+)
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Kolosal RMS MarkItDown API",
     description="A FastAPI server for converting various file formats to Markdown using Microsoft's MarkItDown library",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    # orjson's C encoder keeps multi-MB markdown payloads cheap to serialize
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+class UploadSizeLimitMiddleware:
+    """
+    Refuse single-file uploads whose declared length exceeds MAX_FILE_SIZE
+    before the body is received and spooled
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            MAX_FILE_SIZE > 0
+            and scope["type"] == "http"
+            and scope["method"] == "POST"
+            and scope["path"] in FORMAT_PATHS
+        ):
+            content_length = dict(scope["headers"]).get(b"content-length", b"")
+            if content_length.isdigit() and int(content_length) > MAX_FILE_SIZE + MULTIPART_OVERHEAD:
+                response = ORJSONResponse(
+                    status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                    content={"detail": f"File too large. Maximum size: {MAX_FILE_SIZE} bytes"}
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+# Registered before CORS so CORSMiddleware wraps it and its 413 carries CORS headers
+app.add_middleware(UploadSizeLimitMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -32,48 +240,354 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Thread pool for CPU-bound operations
-executor = ThreadPoolExecutor(max_workers=4)
+# Compress responses; markdown text typically shrinks several times over
+app.add_middleware(GZipMiddleware, minimum_size=4096)
 
 # Initialize MarkItDown instance
 markitdown = MarkItDown(enable_plugins=False)
 
-def convert_file_sync(file_content: bytes, filename: str, is_html: bool = False) -> Dict[str, Any]:
+# Supported file extensions mapped to (format, is_html)
+EXT_MAP: Mapping[str, Tuple[str, bool]] = MappingProxyType({
+    "pdf": ("pdf", False),
+    "docx": ("docx", False),
+    "xlsx": ("xlsx", False),
+    "xls": ("xlsx", False),
+    "pptx": ("pptx", False),
+    "ppt": ("pptx", False),
+    "html": ("html", True),
+    "htm": ("html", True)
+})
+
+# Extensions accepted by each endpoint
+PDF_TYPES = frozenset({"pdf"})
+DOCX_TYPES = frozenset({"docx"})
+XLSX_TYPES = frozenset({"xlsx", "xls"})
+PPTX_TYPES = frozenset({"pptx", "ppt"})
+HTML_TYPES = frozenset({"html", "htm"})
+SUPPORTED_TYPES = frozenset(EXT_MAP)
+
+# Single-file conversion endpoints: (path, accepted extensions, description)
+FORMATS: Tuple[Tuple[str, FrozenSet[str], str], ...] = (
+    ("/parse_pdf", PDF_TYPES, "Convert PDF files to Markdown"),
+    ("/parse_docx", DOCX_TYPES, "Convert Word documents to Markdown"),
+    ("/parse_xlsx", XLSX_TYPES, "Convert Excel files to Markdown"),
+    ("/parse_pptx", PPTX_TYPES, "Convert PowerPoint presentations to Markdown"),
+    ("/parse_html", HTML_TYPES, "Convert HTML files to Markdown")
+)
+FORMAT_PATHS = frozenset(path for path, _, _ in FORMATS)
+
+# MIME type per extension, looked up once instead of on every request
+MIME_BY_EXT: Mapping[str, Optional[str]] = MappingProxyType({
+    ext: mimetypes.types_map.get(f".{ext}") or mimetypes.guess_type(f"file.{ext}")[0]
+    for ext in EXT_MAP
+})
+
+# Format hints per extension so MarkItDown can trust the endpoint instead of guessing
+STREAM_INFO_BY_EXT: Mapping[str, StreamInfo] = MappingProxyType({
+    ext: StreamInfo(extension=f".{ext}", mimetype=MIME_BY_EXT[ext])
+    for ext in EXT_MAP
+})
+
+def file_extension(filename: str) -> str:
+    """
+    Return the lowercased text after the last dot, so names like ".pdf" still count as PDF
+    """
+    return filename.rpartition(".")[2].lower() if "." in filename else ""
+
+# Converted markdown, document title and file size, as returned by the workers
+Conversion = Tuple[str, Optional[str], int]
+
+# HTML needs no format detection at all, so it goes straight to the converter
+html_converter = HtmlConverter()
+
+def normalize_markdown(text: str) -> str:
+    """
+    Apply the whitespace normalization MarkItDown performs after converting
+    """
+    text = "\n".join(line.rstrip() for line in re.split(r"\r?\n", text))
+    return re.sub(r"\n{3,}", "\n\n", text)
+
+class ResultCache:
+    """
+    Thread-safe LRU of conversion results keyed by upload digest and format,
+    bounded by entry count and total UTF-8 size of the cached markdown
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # Each entry keeps its encoded size so eviction does not re-encode the markdown
+        self._entries: "OrderedDict[Tuple[bytes, str], Tuple[Conversion, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[bytes, str]) -> Optional[Conversion]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Tuple[bytes, str], result: Conversion) -> None:
+        if self.max_entries <= 0:
+            return
+        size = len((result[0] or "").encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (result, size)
+            self._bytes += size
+            # Evict least recently used entries until both bounds hold
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
+
+# Cache of recent conversions so re-submitted files skip parsing (0 entries disables it)
+result_cache = ResultCache(
+    max_entries=int(os.getenv("CACHE_MAX_ENTRIES", "256")),
+    max_bytes=int(os.getenv("CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+)
+
+# Reusable read buffers for hashing uploads, so chunks are not allocated per request
+BUFFER_SIZE = 1024 * 1024
+BUFFER_POOL: "LifoQueue[bytearray]" = LifoQueue(maxsize=16)
+
+def acquire_buffer() -> bytearray:
+    """
+    Take a read buffer from the pool, allocating one if the pool is empty
+    """
+    try:
+        return BUFFER_POOL.get_nowait()
+    except Empty:
+        return bytearray(BUFFER_SIZE)
+
+def release_buffer(buffer: bytearray) -> None:
+    """
+    Return a read buffer to the pool, dropping it if the pool is full
+    """
+    try:
+        BUFFER_POOL.put_nowait(buffer)
+    except Full:
+        pass
+
+def hash_file_sync(file_obj: BinaryIO) -> bytes:
+    """
+    Compute the SHA-256 digest of a file object in chunks, leaving it rewound
+    """
+    digest = hashlib.sha256()
+    buffer = acquire_buffer()
+    try:
+        with memoryview(buffer) as view:
+            file_obj.seek(0)
+            while True:
+                read = file_obj.readinto(buffer)
+                if not read:
+                    break
+                digest.update(view[:read])
+            file_obj.seek(0)
+    finally:
+        release_buffer(buffer)
+    return digest.digest()
+
+def convert_file_sync(file_obj: BinaryIO, filename: str, is_html: bool = False) -> Conversion:
     """
     Synchronous file conversion function to be run in thread pool
     """
     try:
+        # SpooledTemporaryFile is not a BufferedIOBase, which MarkItDown's type
+        # sniffer requires; hand over its backing buffer (BytesIO or disk file)
+        file_obj = getattr(file_obj, "_file", file_obj)
+        
+        # Determine the upload size without reading it into memory
+        file_obj.seek(0, io.SEEK_END)
+        file_size = file_obj.tell()
+        # Ensure we're at the beginning of the stream
+        file_obj.seek(0)
+        
+        # Convert using MarkItDown, streaming straight from the spooled upload
+        stream_info = STREAM_INFO_BY_EXT[file_extension(filename)]
         if is_html:
-            # For HTML files, use the content directly as MarkItDown can handle it
-            file_stream = io.BytesIO(file_content)
-            file_stream.name = filename
+            result = html_converter.convert(file_obj, stream_info)
+            result.text_content = normalize_markdown(result.text_content)
         else:
-            # For non-HTML files (PDF, DOCX, XLSX, PPTX), ensure proper BytesIO handling
-            file_stream = io.BytesIO(file_content)
-            file_stream.name = filename
-            # Ensure we're at the beginning of the stream
-            file_stream.seek(0)
-        
-        # Convert using MarkItDown
-        result = markitdown.convert_stream(file_stream)
+            result = markitdown.convert_stream(file_obj, stream_info=stream_info)
         
-        return {
-            "success": True,
-            "filename": filename,
-            "markdown_content": result.text_content,
-            "title": result.title or filename,
-            "metadata": {
-                "original_filename": filename,
-                "file_size": len(file_content),
-                "mime_type": mimetypes.guess_type(filename)[0],
-                "file_type": "html" if is_html else "binary"
-            }
-        }
+        return result.text_content, result.title, file_size
     except Exception as e:
         logger.error(f"Error converting file {filename}: {str(e)}")
         raise e
 
-async def process_file(file: UploadFile, expected_types: list, is_html: bool = False) -> Dict[str, Any]:
+def convert_bytes_sync(file_content: bytes, filename: str, is_html: bool = False) -> Conversion:
+    """
+    Picklable entry point for converting raw file content in the process pool
+    """
+    return convert_file_sync(io.BytesIO(file_content), filename, is_html)
+
+def convert_path_sync(path: str, filename: str, is_html: bool = False) -> Conversion:
+    """
+    Picklable entry point for converting a file on disk in the process pool
+    """
+    with open(path, "rb") as file_obj:
+        return convert_file_sync(file_obj, filename, is_html)
+
+def copy_fd_sync(src_fd: int, dst_fd: int, size: int) -> None:
+    """
+    Copy size bytes between file descriptors, keeping the data in the kernel where possible
+    """
+    offset = 0
+    
+    # copy_file_range (Linux 4.5+) can share extents without touching the page cache
+    if hasattr(os, "copy_file_range"):
+        try:
+            while offset < size:
+                copied = os.copy_file_range(src_fd, dst_fd, size - offset, offset, offset)
+                if copied == 0:
+                    break
+                offset += copied
+        except OSError:
+            # Not supported for this pair of files; fall back below
+            pass
+    
+    # sendfile still avoids bouncing the data through user space
+    if offset < size and hasattr(os, "sendfile"):
+        try:
+            os.lseek(dst_fd, offset, os.SEEK_SET)
+            while offset < size:
+                copied = os.sendfile(dst_fd, src_fd, offset, size - offset)
+                if copied == 0:
+                    break
+                offset += copied
+        except OSError:
+            pass
+    
+    # Portable fallback through a user-space buffer
+    if offset < size:
+        with os.fdopen(os.dup(src_fd), "rb") as src, os.fdopen(os.dup(dst_fd), "wb") as dst:
+            src.seek(offset)
+            dst.seek(offset)
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+
+def uring_copy_sync(src_fd: int, dst_fd: int) -> bool:
+    """
+    Copy a file with batched io_uring reads and writes, returning False if io_uring is unusable
+    """
+    # pyuring copies between paths; the /proc paths of our descriptors also work for an
+    # anonymous spool file, and a destination unlinked by a cancelled request is never
+    # recreated by name
+    try:
+        pyuring.copy(
+            f"/proc/self/fd/{src_fd}",
+            f"/proc/self/fd/{dst_fd}",
+            mode="fast",
+            qd=32,
+            block_size=1024 * 1024
+        )
+        return True
+    except OSError as e:
+        # pyuring.UringError is an OSError, e.g. when the kernel refuses io_uring
+        logger.warning(f"io_uring copy failed, falling back to copy_file_range/sendfile: {str(e)}")
+        return False
+
+def spill_to_named_file_sync(file_obj: BinaryIO, path: str) -> None:
+    """
+    Copy a disk-backed upload into the named file at path so worker processes can open it
+    """
+    source = getattr(file_obj, "_file", file_obj)
+    source.flush()
+    size = os.fstat(source.fileno()).st_size
+    fd = os.open(path, os.O_WRONLY)
+    try:
+        if not (pyuring is not None and uring_copy_sync(source.fileno(), fd)):
+            copy_fd_sync(source.fileno(), fd, size)
+    finally:
+        os.close(fd)
+
+WARM_UP_HTML = b"<html><head><title>Warm up</title></head><body><p>Warm up</p></body></html>"
+
+def warm_up_sync() -> None:
+    """
+    Run format detection and an HTML conversion once so their first-use costs are paid up front
+    """
+    markitdown.convert_stream(io.BytesIO(WARM_UP_HTML), stream_info=STREAM_INFO_BY_EXT["html"])
+    convert_file_sync(io.BytesIO(WARM_UP_HTML), "warm_up.html", is_html=True)
+
+async def warm_up() -> None:
+    """
+    Warm the thread pool and spawn every process pool worker before serving traffic
+    """
+    async def warm_up_worker() -> None:
+        # Awaited inside a coroutine so a pool that is already broken is reported via gather
+        await asyncio.get_running_loop().run_in_executor(cpu_pool, warm_up_sync)
+    
+    tasks = [asyncio.to_thread(warm_up_sync)]
+    if cpu_pool is not None:
+        tasks += [warm_up_worker() for _ in range(PROCESS_POOL_SIZE)]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    # A pool whose workers cannot even start would fail every non-HTML request
+    for result in results:
+        if isinstance(result, BrokenProcessPool):
+            raise RuntimeError("Process pool workers failed to start") from result
+    failures = [result for result in results if isinstance(result, Exception)]
+    if failures:
+        logger.warning(f"Warm-up failed, first requests may be slower: {str(failures[0])}")
+    else:
+        logger.info("Warm-up complete")
+
+async def run_in_cpu_pool(func, *args) -> Conversion:
+    """
+    Run a conversion in the process pool, restarting the pool if a worker died
+    """
+    pool = cpu_pool
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+    except BrokenProcessPool:
+        # The file may be what crashed the worker, so report rather than retry it
+        replace_broken_cpu_pool(pool)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Conversion worker crashed, please retry later"
+        )
+
+def build_result(filename: str, file_ext: str, is_html: bool, conversion: Conversion) -> Dict[str, Any]:
+    """
+    Assemble the API response for a converted file
+    """
+    markdown_content, title, file_size = conversion
+    return {
+        "success": True,
+        "filename": filename,
+        "markdown_content": markdown_content,
+        "title": title or filename,
+        "metadata": {
+            "original_filename": filename,
+            "file_size": file_size,
+            "mime_type": MIME_BY_EXT[file_ext],
+            "file_type": "html" if is_html else "binary"
+        }
+    }
+
+async def process_file(file: UploadFile, expected_types: FrozenSet[str]) -> Dict[str, Any]:
     """
     Process uploaded file asynchronously with thread safety
     """
@@ -85,34 +599,97 @@ async def process_file(file: UploadFile, expected_types: list, is_html: bool = F
         )
     
     # Check file extension
-    file_ext = file.filename.lower().split('.')[-1] if '.' in file.filename else ''
+    file_ext = file_extension(file.filename)
     if file_ext not in expected_types:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid file type. Expected: {', '.join(expected_types)}"
+            detail=f"Invalid file type. Expected: {', '.join(sorted(expected_types))}"
         )
+    file_format, is_html = EXT_MAP[file_ext]
     
     try:
-        # Read file content
-        file_content = await file.read()
-        
-        if not file_content:
+        # Starlette has already spooled the upload (in memory up to 1MB, on disk beyond)
+        if not file.size:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Empty file provided"
             )
+        if MAX_FILE_SIZE > 0 and file.size > MAX_FILE_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                detail=f"File too large. Maximum size: {MAX_FILE_SIZE} bytes"
+            )
         
-        # Process in thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            executor, 
-            convert_file_sync, 
-            file_content, 
-            file.filename,
-            is_html
-        )
+        # Identical uploads of the same format are served from the result cache
+        if result_cache.max_entries > 0:
+            cache_key = (await asyncio.to_thread(hash_file_sync, file.file), file_format)
+            cached = result_cache.get(cache_key)
+            if cached is not None:
+                return build_result(file.filename, file_ext, is_html, cached)
+        else:
+            cache_key = None
         
-        return result
+        # Wait for a free conversion slot (largest uploads first), shedding load if the wait is too long
+        wait_started = time.perf_counter()
+        try:
+            if CONVERT_QUEUE_TIMEOUT > 0:
+                await asyncio.wait_for(convert_semaphore.acquire(file.size), timeout=CONVERT_QUEUE_TIMEOUT)
+            else:
+                await convert_semaphore.acquire(file.size)
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry later"
+            )
+        finally:
+            CONVERT_WAIT_SECONDS.observe(time.perf_counter() - wait_started)
+        
+        convert_started = time.perf_counter()
+        try:
+            if is_html or cpu_pool is None:
+                # Process in thread pool to avoid blocking
+                conversion = await asyncio.to_thread(
+                    convert_file_sync, 
+                    file.file, 
+                    file.filename,
+                    is_html
+                )
+            elif getattr(file.file, "_rolled", False):
+                # Large uploads spooled to disk reach the worker as a named file
+                # copied in-kernel, rather than as bytes pickled through a pipe
+                fd, path = tempfile.mkstemp(prefix="markitdown-")
+                os.close(fd)
+                # Removed here even if the request is cancelled while the copy is running
+                try:
+                    await asyncio.to_thread(spill_to_named_file_sync, file.file, path)
+                    conversion = await run_in_cpu_pool(
+                        convert_path_sync,
+                        path,
+                        file.filename,
+                        is_html
+                    )
+                finally:
+                    try:
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        pass
+            else:
+                # File objects cannot cross the process boundary, so ship the bytes
+                await file.seek(0)
+                file_content = await file.read()
+                conversion = await run_in_cpu_pool(
+                    convert_bytes_sync,
+                    file_content,
+                    file.filename,
+                    is_html
+                )
+        finally:
+            convert_semaphore.release()
+            CONVERT_SECONDS.labels(file_format).observe(time.perf_counter() - convert_started)
+        
+        if cache_key is not None:
+            result_cache.put(cache_key, conversion)
+        return build_result(file.filename, file_ext, is_html, conversion)
         
     except HTTPException:
         raise
@@ -130,12 +707,8 @@ async def root():
         "message": "Kolosal RMS MarkItDown API",
         "description": "Convert various file formats to Markdown using Microsoft's MarkItDown library",
         "version": "1.0.0",
-        "endpoints": [
-            "/parse_pdf - Convert PDF files to Markdown",
-            "/parse_docx - Convert Word documents to Markdown", 
-            "/parse_xlsx - Convert Excel files to Markdown",
-            "/parse_pptx - Convert PowerPoint presentations to Markdown",
-            "/parse_html - Convert HTML files to Markdown"
+        "endpoints": [f"{path} - {description}" for path, _, description in FORMATS] + [
+            "/parse_batch - Convert several supported files in one request"
         ],
         "credits": "Built using Microsoft MarkItDown: https://github.com/microsoft/markitdown"
     }
@@ -145,51 +718,73 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "markitdown-api"}
 
-@app.post("/parse_pdf")
-async def parse_pdf(file: UploadFile = File(...)):
-    """
-    Convert PDF files to Markdown
-    """
-    result = await process_file(file, ['pdf'])
-    return JSONResponse(content=result, status_code=200)
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics endpoint"""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
-@app.post("/parse_docx")
-async def parse_docx(file: UploadFile = File(...)):
-    """
-    Convert Word documents to Markdown
-    """
-    result = await process_file(file, ['docx'])
-    return JSONResponse(content=result, status_code=200)
+@app.get("/cache/stats")
+async def cache_stats():
+    """Result cache statistics"""
+    return result_cache.stats()
 
-@app.post("/parse_xlsx")
-async def parse_xlsx(file: UploadFile = File(...)):
+def make_parse_handler(expected_types: FrozenSet[str]):
     """
-    Convert Excel files to Markdown
+    Build the endpoint for one single-file format
     """
-    result = await process_file(file, ['xlsx', 'xls'])
-    return JSONResponse(content=result, status_code=200)
+    async def handler(file: UploadFile = File(...)):
+        return await process_file(file, expected_types)
+    return handler
 
-@app.post("/parse_pptx")
-async def parse_pptx(file: UploadFile = File(...)):
-    """
-    Convert PowerPoint presentations to Markdown
-    """
-    result = await process_file(file, ['pptx', 'ppt'])
-    return JSONResponse(content=result, status_code=200)
+# Register the single-file endpoints; route names match the original parse_* handlers
+for path, expected_types, description in FORMATS:
+    app.post(path, name=path.lstrip("/"), description=description)(make_parse_handler(expected_types))
 
-@app.post("/parse_html")
-async def parse_html(file: UploadFile = File(...)):
+@app.post("/parse_batch")
+async def parse_batch(files: List[UploadFile] = File(...)):
     """
-    Convert HTML files to Markdown
+    Convert several files of any supported type to Markdown concurrently
     """
-    result = await process_file(file, ['html', 'htm'], is_html=True)
-    return JSONResponse(content=result, status_code=200)
+    batch_semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    
+    async def convert_one(file: UploadFile) -> Dict[str, Any]:
+        async with batch_semaphore:
+            return await process_file(file, SUPPORTED_TYPES)
+    
+    # Start the largest files first so small ones fill in around them instead of
+    # leaving a big straggler at the end; results are returned in upload order
+    order = sorted(range(len(files)), key=lambda i: files[i].size or 0, reverse=True)
+    ordered_results = await asyncio.gather(*[convert_one(files[i]) for i in order], return_exceptions=True)
+    results: List[Any] = [None] * len(files)
+    for i, result in zip(order, ordered_results):
+        results[i] = result
+    
+    # Report failures per file so one bad upload does not fail the whole batch
+    response = []
+    for file, result in zip(files, results):
+        if isinstance(result, HTTPException):
+            response.append({
+                "success": False,
+                "filename": file.filename,
+                "status_code": result.status_code,
+                "detail": result.detail
+            })
+        elif isinstance(result, Exception):
+            response.append({
+                "success": False,
+                "filename": file.filename,
+                "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "detail": f"Internal server error: {str(result)}"
+            })
+        else:
+            response.append(result)
+    return response
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler"""
     logger.error(f"Global exception: {str(exc)}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={"detail": "Internal server error occurred"}
     )
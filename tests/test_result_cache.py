@@ -0,0 +1,78 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import ResultCache
+
+
+def conversion(text):
+    return (text, None, len(text))
+
+
+def test_evicts_least_recently_used_past_max_entries():
+    cache = ResultCache(max_entries=2, max_bytes=1024)
+    cache.put((b"a", "pdf"), conversion("a"))
+    cache.put((b"b", "pdf"), conversion("b"))
+    # Touch "a" so "b" becomes the least recently used entry
+    assert cache.get((b"a", "pdf")) == conversion("a")
+    cache.put((b"c", "pdf"), conversion("c"))
+
+    assert cache.get((b"b", "pdf")) is None
+    assert cache.get((b"a", "pdf")) == conversion("a")
+    assert cache.get((b"c", "pdf")) == conversion("c")
+    assert cache.stats()["entries"] == 2
+
+
+def test_byte_bound_counts_encoded_size():
+    # Each CJK character is 3 bytes in UTF-8, so 4 characters take 12 bytes
+    cache = ResultCache(max_entries=10, max_bytes=20)
+    cache.put((b"a", "pdf"), conversion("文字文字"))
+    assert cache.stats()["bytes"] == 12
+
+    cache.put((b"b", "pdf"), conversion("文字文字"))
+
+    assert cache.get((b"a", "pdf")) is None
+    assert cache.get((b"b", "pdf")) == conversion("文字文字")
+    assert cache.stats()["bytes"] == 12
+
+
+def test_eviction_runs_until_byte_bound_holds():
+    cache = ResultCache(max_entries=10, max_bytes=10)
+    for key in (b"a", b"b", b"c"):
+        cache.put((key, "pdf"), conversion("xxx"))
+    cache.put((b"d", "pdf"), conversion("x" * 9))
+
+    stats = cache.stats()
+    assert stats["entries"] == 1
+    assert stats["bytes"] == 9
+    assert cache.get((b"d", "pdf")) == conversion("x" * 9)
+
+
+def test_replacing_a_key_updates_its_size():
+    cache = ResultCache(max_entries=10, max_bytes=100)
+    cache.put((b"a", "pdf"), conversion("x" * 40))
+    cache.put((b"a", "pdf"), conversion("x" * 10))
+
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["bytes"] == 10
+
+
+def test_skips_entries_that_cannot_fit():
+    cache = ResultCache(max_entries=10, max_bytes=8)
+    cache.put((b"a", "pdf"), conversion("ok"))
+    cache.put((b"b", "pdf"), conversion("文字文"))
+
+    assert cache.get((b"b", "pdf")) is None
+    assert cache.get((b"a", "pdf")) == conversion("ok")
+
+
+def test_disabled_cache_stores_nothing():
+    cache = ResultCache(max_entries=0, max_bytes=1024)
+    cache.put((b"a", "pdf"), conversion("a"))
+
+    assert cache.get((b"a", "pdf")) is None
+    stats = cache.stats()
+    assert stats["entries"] == 0
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.0
@@ -0,0 +1,64 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import SizeAwareSemaphore
+
+
+def test_admits_largest_waiter_first():
+    async def scenario():
+        semaphore = SizeAwareSemaphore(1)
+        await semaphore.acquire()
+        admitted = []
+
+        async def waiter(size):
+            await semaphore.acquire(size)
+            admitted.append(size)
+            semaphore.release()
+
+        tasks = [asyncio.create_task(waiter(size)) for size in (1, 5, 3)]
+        await asyncio.sleep(0)
+        semaphore.release()
+        await asyncio.gather(*tasks)
+        return admitted
+
+    assert asyncio.run(scenario()) == [5, 3, 1]
+
+
+def test_cancel_during_release_keeps_permit():
+    async def scenario():
+        semaphore = SizeAwareSemaphore(1)
+        await semaphore.acquire()
+        waiter = asyncio.create_task(semaphore.acquire(10))
+        await asyncio.sleep(0)
+
+        # Cancel the waiter and release before its cleanup gets to run
+        waiter.cancel()
+        semaphore.release()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            pass
+
+        # The permit must still be available to a fresh acquire
+        await asyncio.wait_for(semaphore.acquire(), timeout=1)
+        return semaphore._value, semaphore._waiters
+
+    assert asyncio.run(scenario()) == (0, [])
+
+
+def test_timed_out_waiter_is_removed():
+    async def scenario():
+        semaphore = SizeAwareSemaphore(1)
+        await semaphore.acquire()
+        try:
+            await asyncio.wait_for(semaphore.acquire(10), timeout=0.01)
+        except asyncio.TimeoutError:
+            pass
+        waiters = list(semaphore._waiters)
+        semaphore.release()
+        return waiters, semaphore._value
+
+    assert asyncio.run(scenario()) == ([], 1)
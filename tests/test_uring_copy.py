@@ -0,0 +1,60 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+
+class StubUring:
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+
+    def copy(self, src_path, dst_path, **kwargs):
+        self.calls.append((src_path, dst_path, kwargs))
+        if self.error is not None:
+            raise self.error
+
+
+def test_uring_copy_passes_descriptor_paths(monkeypatch):
+    stub = StubUring()
+    monkeypatch.setattr(main, "pyuring", stub)
+
+    assert main.uring_copy_sync(7, 9) is True
+    assert stub.calls == [
+        ("/proc/self/fd/7", "/proc/self/fd/9", {"mode": "fast", "qd": 32, "block_size": 1024 * 1024})
+    ]
+
+
+def test_uring_copy_falls_back_on_os_error(monkeypatch):
+    monkeypatch.setattr(main, "pyuring", StubUring(error=OSError("io_uring disabled")))
+
+    assert main.uring_copy_sync(7, 9) is False
+
+
+def test_uring_copy_does_not_swallow_programming_errors(monkeypatch):
+    monkeypatch.setattr(main, "pyuring", StubUring(error=TypeError("bad argument")))
+
+    try:
+        main.uring_copy_sync(7, 9)
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("TypeError was swallowed")
+
+
+def test_spill_falls_back_when_uring_fails(monkeypatch):
+    monkeypatch.setattr(main, "pyuring", StubUring(error=OSError("io_uring disabled")))
+    data = os.urandom(3 * 1024 * 1024 + 7)
+    with tempfile.TemporaryFile() as source:
+        source.write(data)
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            main.spill_to_named_file_sync(source, path)
+            with open(path, "rb") as copied:
+                assert copied.read() == data
+        finally:
+            os.unlink(path)